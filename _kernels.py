@@ -0,0 +1,59 @@
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Draws per parallel chunk. Each chunk reseeds its thread's RNG so results are reproducible
+# regardless of how chunks are scheduled across threads.
+_CHUNK_SIZE = 1 << 16
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _count_conversions(n: int, p: float, chunk_seeds: np.ndarray) -> int:
+        """Counts successes among n Bernoulli(p) draws without materializing them."""
+        n_chunks = chunk_seeds.size
+        counts = np.zeros(n_chunks, dtype=np.int64)
+        for c in prange(n_chunks):
+            np.random.seed(chunk_seeds[c])
+            stop = min((c + 1) * _CHUNK_SIZE, n)
+            k = 0
+            for _ in range(c * _CHUNK_SIZE, stop):
+                if np.random.random() < p:
+                    k += 1
+            counts[c] = k
+        return counts.sum()
+
+
+def _chunk_seeds(seed_seq: np.random.SeedSequence, n: int) -> np.ndarray:
+    """One uint32 seed per chunk of n draws, hashed from the group's own SeedSequence."""
+    n_chunks = (n + _CHUNK_SIZE - 1) // _CHUNK_SIZE
+    return seed_seq.generate_state(n_chunks, dtype=np.uint32)
+
+
+def simulate_counts(n_c: int, n_t: int, p_c: float, p_t: float, seed: int = None) -> tuple[int, int]:
+    """
+    Simulates the number of conversions in the control and test groups.
+
+    Uses a parallel Numba kernel when numba is installed, otherwise a single binomial draw
+    per group. Both paths are reproducible for a fixed seed, but they do not produce the same counts.
+    Each group draws from its own SeedSequence child, so control and test chunks are seeded
+    independently rather than from overlapping integer ranges.
+
+    Returns:
+        tuple[int, int]: (k_c, k_t), the conversion counts for control and test.
+    """
+    seq_c, seq_t = np.random.SeedSequence(seed).spawn(2)
+    if not NUMBA_AVAILABLE:
+        k_c = np.random.default_rng(seq_c).binomial(n_c, p_c)
+        k_t = np.random.default_rng(seq_t).binomial(n_t, p_t)
+        return int(k_c), int(k_t)
+
+    return (int(_count_conversions(n_c, p_c, _chunk_seeds(seq_c, n_c))),
+            int(_count_conversions(n_t, p_t, _chunk_seeds(seq_t, n_t))))
@@ -1,18 +1,36 @@
+"""
+Data handling for A/B tests.
+
+Per-group data lives in NumPy arrays; DataFrames are only built on request. When several
+frames need combining, collect them in a list and call pd.concat once. Growing a frame with
+`df = pd.concat([df, new])` inside a loop copies everything accumulated so far on every
+iteration, which is quadratic in the number of rows.
+"""
+import functools
 import pandas as pd
 import numpy as np
 from config import ABTestConfig
+from _kernels import simulate_counts
 import logging
 
+logger = logging.getLogger(__name__)
 
+# Shared dtype for every 'group' column, so frames from either group concatenate as categoricals
+GROUP_DTYPE = pd.CategoricalDtype(categories=['control', 'test'])
+
+
+@functools.lru_cache(maxsize=32)
+def _simulate_counts_cached(n_c: int, n_t: int, p_c: float, p_t: float, seed: int) -> tuple[int, int]:
+    """Memoized simulate_counts; only valid for a fixed seed, where the result is deterministic."""
+    return simulate_counts(n_c, n_t, p_c, p_t, seed)
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
 
 class ABTestDataSet:
     """
     Manages A/B test data, including generation of synthetic data or loading existing data.
     """
-    def __init__(self, config: ABTestConfig, control_df: pd.DataFrame = None, test_df: pd.DataFrame = None):
+    def __init__(self, config: ABTestConfig, control_df: pd.DataFrame = None, test_df: pd.DataFrame = None,
+                 fast_mode: bool = False):
         """
         Initializes the data set. If control_df and test_df are provided, they are used.
         Otherwise, synthetic data is generated.
@@ -21,17 +39,23 @@ class ABTestDataSet:
             config (ABTestConfig): Configuration object for parameters.
             control_df (pd.DataFrame, optional): Pre-existing control group data.
             test_df (pd.DataFrame, optional): Pre-existing test group data.
+            fast_mode (bool): If True, synthetic data is simulated as conversion counts only;
+                              no per-user arrays or DataFrames are available.
         """
         self.config = config
-        self._control_df: pd.DataFrame = pd.DataFrame()
-        self._test_df: pd.DataFrame = pd.DataFrame()
+        self.fast_mode = fast_mode
+        self._control_arr: np.ndarray = np.empty(0, dtype=np.uint8)
+        self._test_arr: np.ndarray = np.empty(0, dtype=np.uint8)
+        self._control_count: int = 0
+        self._test_count: int = 0
+        self._rng = np.random.default_rng(self.config.random_seed)
 
         if control_df is not None and test_df is not None:
             self._load_existing_data(control_df, test_df)
         else:
             self.generate_synthetic_data()
 
-        logger.info(f"ABTestDataSet ready: Control samples={len(self._control_df)}, Test samples={len(self._test_df)}")
+        logger.info(f"ABTestDataSet ready: Control samples={self.config.n_control}, Test samples={self.config.n_test}")
 
     def _load_existing_data(self, control_df: pd.DataFrame, test_df: pd.DataFrame):
         """Internal method to load existing dataframes."""
@@ -42,48 +66,119 @@ class ABTestDataSet:
            not pd.api.types.is_numeric_dtype(test_df['converted']):
             raise ValueError("The 'converted' column in existing data must be numeric (0 or 1).")
 
-        self._control_df = control_df.copy()
-        self._test_df = test_df.copy()
+        # Only 'converted' is analyzed, so keep just that column rather than the whole uploaded frame
+        self._control_arr = self._to_conversion_array(control_df['converted'])
+        self._test_arr = self._to_conversion_array(test_df['converted'])
         # Update config n_control/n_test if using existing data, for consistency in reporting
-        self.config.n_control = len(self._control_df)
-        self.config.n_test = len(self._test_df)
+        self.config.n_control = len(self._control_arr)
+        self.config.n_test = len(self._test_arr)
+        self._control_count = int(np.count_nonzero(self._control_arr))
+        self._test_count = int(np.count_nonzero(self._test_arr))
         logger.info("ABTestDataSet loaded from existing data.")
 
+    @staticmethod
+    def _to_conversion_array(converted: pd.Series) -> np.ndarray:
+        """
+        Validates that a 'converted' column only holds 0/1 and downcasts it once to a contiguous uint8 array.
+        The check runs on the values as given, so callers must not narrow the dtype beforehand:
+        a uint8 cast would already have wrapped values such as 256 or -1 into range.
+        """
+        # Checked first: nullable columns with NA convert to object arrays that can't be compared to 0/1
+        if converted.isna().any():
+            raise ValueError("The 'converted' column in existing data must not contain missing values.")
+        arr = converted.to_numpy()
+        if arr.dtype.kind != 'b' and not ((arr == 0) | (arr == 1)).all():
+            raise ValueError("The 'converted' column in existing data must only contain 0 or 1.")
+        return np.ascontiguousarray(arr, dtype=np.uint8)
+
+    def _draw_conversions(self, p: float, n: int) -> np.ndarray:
+        """
+        Draws n Bernoulli(p) outcomes as a uint8 array.
+        Thresholding float64 uniforms is 2-4x faster than rng.binomial(1, p, n). float64 is required:
+        the uniforms have 2**-53 resolution, so P(u < p) is within ~1e-16 of p. float32 uniforms
+        (2**-24 resolution) would round rare-event rates up, e.g. p=3e-8 would convert at ~6e-8.
+        """
+        return (self._rng.random(n) < p).view(np.uint8)
 
     def generate_synthetic_data(self):
         """
         Generates synthetic A/B test data based on the provided configuration.
         """
-        if self.config.random_seed is not None:
-            np.random.seed(self.config.random_seed)
+        test_conversion_rate = self.config.baseline_conversion_rate + self.config.expected_uplift
+        test_conversion_rate = min(test_conversion_rate, 1.0) # Cap at 1.0
+
+        if self.fast_mode:
+            simulate = simulate_counts if self.config.random_seed is None else _simulate_counts_cached
+            self._control_count, self._test_count = simulate(
+                self.config.n_control, self.config.n_test,
+                self.config.baseline_conversion_rate, test_conversion_rate,
+                self.config.random_seed
+            )
+            logger.info("ABTestDataSet simulated conversion counts (fast mode).")
+            return
 
         # Control Group Data
-        control_conversions = np.random.binomial(1, self.config.baseline_conversion_rate, self.config.n_control)
-        self._control_df = pd.DataFrame({
-            'user_id': range(self.config.n_control),
-            'group': 'control',
-            'converted': control_conversions
-        })
+        self._control_arr = self._draw_conversions(self.config.baseline_conversion_rate, self.config.n_control)
+        self._control_count = int(np.count_nonzero(self._control_arr))
 
         # Test Group Data
-        test_conversion_rate = self.config.baseline_conversion_rate + self.config.expected_uplift
-        test_conversion_rate = min(test_conversion_rate, 1.0) # Cap at 1.0
-        test_conversions = np.random.binomial(1, test_conversion_rate, self.config.n_test)
-        self._test_df = pd.DataFrame({
-            'user_id': range(self.config.n_control, self.config.n_control + self.config.n_test),
-            'group': 'test',
-            'converted': test_conversions
-        })
+        self._test_arr = self._draw_conversions(test_conversion_rate, self.config.n_test)
+        self._test_count = int(np.count_nonzero(self._test_arr))
         logger.info("ABTestDataSet generated synthetic data.")
 
+    def get_control_counts(self) -> tuple[int, int]:
+        """Returns (n, k): the control group size and its number of conversions."""
+        return self.config.n_control, self._control_count
+
+    def get_test_counts(self) -> tuple[int, int]:
+        """Returns (n, k): the test group size and its number of conversions."""
+        return self.config.n_test, self._test_count
+
+    def _require_per_user_data(self):
+        """Raises if only conversion counts are available (fast mode)."""
+        if self.fast_mode:
+            raise ValueError("Per-user data is not available for a fast-mode dataset; use get_*_counts() instead.")
+
+    def get_control_array(self) -> np.ndarray:
+        """Returns the control group conversions as a uint8 array."""
+        self._require_per_user_data()
+        return self._control_arr
+
+    def get_test_array(self) -> np.ndarray:
+        """Returns the test group conversions as a uint8 array."""
+        self._require_per_user_data()
+        return self._test_arr
+
     def get_control_data(self) -> pd.DataFrame:
-        """Returns the control group DataFrame."""
-        return self._control_df
+        """Returns the control group conversions wrapped in a DataFrame."""
+        self._require_per_user_data()
+        return pd.DataFrame({
+            'group': pd.Categorical.from_codes(np.zeros(self._control_arr.size, np.int8), dtype=GROUP_DTYPE),
+            'converted': self._control_arr
+        })
 
     def get_test_data(self) -> pd.DataFrame:
-        """Returns the test group DataFrame."""
-        return self._test_df
+        """Returns the test group conversions wrapped in a DataFrame."""
+        self._require_per_user_data()
+        return pd.DataFrame({
+            'group': pd.Categorical.from_codes(np.ones(self._test_arr.size, np.int8), dtype=GROUP_DTYPE),
+            'converted': self._test_arr
+        })
+
+    def get_combined_array(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (converted, group_id) for both groups, control first.
+        group_id is a uint8 array holding 0 for control rows and 1 for test rows.
+        """
+        self._require_per_user_data()
+        converted = np.concatenate([self._control_arr, self._test_arr])
+        group_id = np.repeat(np.array([0, 1], dtype=np.uint8), [self._control_arr.size, self._test_arr.size])
+        return converted, group_id
 
     def get_combined_data(self) -> pd.DataFrame:
-        """Returns a concatenated DataFrame of both control and test groups."""
-        return pd.concat([self._control_df, self._test_df], ignore_index=True)
+        """Returns a DataFrame of both control and test groups with a categorical 'group' column."""
+        converted, group_id = self.get_combined_array()
+        return pd.DataFrame({
+            'group': pd.Categorical.from_codes(group_id, dtype=GROUP_DTYPE),
+            'converted': converted
+        })
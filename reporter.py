@@ -1,9 +1,8 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import altair as alt
 import logging
+import numpy as np
 import pandas as pd
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class ABTestReporter:
@@ -21,43 +20,65 @@ class ABTestReporter:
         self.alpha = self.results.get('alpha', 0.05) # Default if missing from results
         logger.info("ABTestReporter initialized for Streamlit.")
 
-    def get_conversion_rates_plot(self) -> plt.Figure:
+    def get_conversion_chart_spec(self) -> alt.LayerChart:
         """
-        Creates and returns a matplotlib Figure object for conversion rates.
+        Creates and returns an Altair chart of conversion rates with confidence interval error bars.
+        Rendered client-side by Vega-Lite, so it is much cheaper for Streamlit than a matplotlib Figure.
         """
-        labels = ['Control', 'Test']
-        conversions = [self.results['control_conversion'], self.results['test_conversion']]
-        ci_lowers = [self.results['ci_control_lower'], self.results['ci_test_lower']]
-        ci_uppers = [self.results['ci_control_upper'], self.results['ci_test_upper']]
-
-        print("conversions:%s ", conversions)
-
-        # Calculate error bar heights
-        errors = [[conversions[i] - ci_lowers[i] for i in range(2)],
-                  [ci_uppers[i] - conversions[i] for i in range(2)]]
-        errors = pd.DataFrame(errors, index=labels, columns=['Lower', 'Upper'])
-        
-        print(f"conversion rates errors: {errors}")
-
-        fig, ax = plt.subplots(figsize=(10, 7))
-
-        plot_df = pd.DataFrame({
-            'Group': labels,
-            'Conversions': conversions,
-            'Lower': ci_lowers,
-            'Upper': ci_uppers,
-
+        chart_df = pd.DataFrame({
+            'Group': ['Control', 'Test'],
+            'Conversion Rate': [self.results['control_conversion'], self.results['test_conversion']],
+            'CI Lower': [self.results['ci_control_lower'], self.results['ci_test_lower']],
+            'CI Upper': [self.results['ci_control_upper'], self.results['ci_test_upper']],
         })
-        
+        base = alt.Chart(chart_df).encode(x=alt.X('Group:N', axis=alt.Axis(labelAngle=0)))
+        bars = base.mark_bar(color='skyblue').encode(
+            y=alt.Y('Conversion Rate:Q'),
+            tooltip=['Group', alt.Tooltip('Conversion Rate:Q', format='.4f'),
+                     alt.Tooltip('CI Lower:Q', format='.4f'), alt.Tooltip('CI Upper:Q', format='.4f')]
+        )
+        error_bars = base.mark_errorbar(ticks=True, color='black').encode(
+            y=alt.Y('CI Lower:Q', title='Conversion Rate'),
+            y2='CI Upper:Q'
+        )
+        chart = (bars + error_bars).properties(
+            title=alt.TitleParams(
+                text=f'A/B Test Conversion Rates with {int((1-self.alpha)*100)}% Confidence Intervals',
+                subtitle=f"P-value: {self.results['p_value']:.4f}   T-stat: {self.results['t_statistic']:.2f}"
+            )
+        )
+        logger.info("Conversion rates chart generated.")
+        return chart
+
+    def get_conversion_rates_plot(self) -> 'matplotlib.figure.Figure':
+        """
+        Creates and returns a matplotlib Figure object for conversion rates,
+        e.g. for exporting the plot outside of Streamlit.
+        The Figure is created directly rather than through pyplot, so pyplot holds no
+        reference to it and it is freed once the caller drops it.
+        """
+        # Deferred so the Streamlit app, which renders the Altair chart, never imports matplotlib
+        from matplotlib.figure import Figure
 
-        sns.barplot(x='Group', y='Conversions', data=plot_df, legend=False ,ax=ax, color='skyblue')
-        ax.errorbar(x=[0, 1],y=conversions,yerr=errors,fmt='none',c='black',capsize=10)
+        labels = ['Control', 'Test']
+        conversions = [self.results['control_conversion'], self.results['test_conversion']]
+        # Error bar heights: row 0 is the distance down to the CI lower bound, row 1 up to the upper bound
+        errors = np.asarray([
+            [conversions[0] - self.results['ci_control_lower'], conversions[1] - self.results['ci_test_lower']],
+            [self.results['ci_control_upper'] - conversions[0], self.results['ci_test_upper'] - conversions[1]]
+        ])
+        logger.debug("Plotting conversions %s with errors %s", conversions, errors)
+
+        fig = Figure(figsize=(10, 7))
+        ax = fig.subplots()
+
+        ax.bar([0, 1], conversions, yerr=errors, capsize=10, color='skyblue', tick_label=labels)
+        ax.set_xlabel('Group')
         ax.set_ylabel('Conversion Rate')
         ax.set_title(f'A/B Test Conversion Rates with {int((1-self.alpha)*100)}% Confidence Intervals')
         ax.set_ylim(0, max(conversions) * 1.2 if max(conversions) * 1.2 > 0.1 else 0.15) # Ensure y-axis starts reasonably
         ax.grid(axis='y', linestyle='--', alpha=0.7)
 
-
         # Add p-value and t-stat text
         ax.text(0.5, ax.get_ylim()[1] * 0.95,
                  f"P-value: {self.results['p_value']:.4f}\nT-stat: {self.results['t_statistic']:.2f}",
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+from config import ABTestConfig
+from data_generator import ABTestDataSet
+from tester_app import _read_converted_csv
+
+
+class _Upload:
+    """Minimal stand-in for a Streamlit UploadedFile."""
+    def __init__(self, content: bytes):
+        self._content = content
+
+    def getvalue(self) -> bytes:
+        return self._content
+
+
+@pytest.mark.parametrize("make_control_df", [
+    lambda: _read_converted_csv(_Upload(b"converted\n0\n1\n256\n")),
+    lambda: _read_converted_csv(_Upload(b"converted\n0\n1\n0.5\n")),
+    lambda: _read_converted_csv(_Upload(b"converted\n0\n1\n-1\n")),
+    lambda: pd.DataFrame({'converted': pd.array([True, False, pd.NA], dtype='boolean')}),
+    lambda: pd.DataFrame({'converted': pd.array([1, 0, pd.NA], dtype='Int64')}),
+], ids=["csv-256", "csv-0.5", "csv-negative", "nullable-boolean-na", "nullable-int-na"])
+def test_non_binary_conversions_are_rejected(make_control_df):
+    control_df = make_control_df()
+    test_df = _read_converted_csv(_Upload(b"converted\n0\n1\n"))
+    with pytest.raises(ValueError):
+        ABTestDataSet(ABTestConfig(), control_df=control_df, test_df=test_df)
+
+
+def test_uploaded_csv_with_binary_conversions_is_loaded():
+    control_df = _read_converted_csv(_Upload(b"converted\n0\n1\n1\n"))
+    test_df = _read_converted_csv(_Upload(b"converted\n1\n0\n"))
+    dataset = ABTestDataSet(ABTestConfig(), control_df=control_df, test_df=test_df)
+    assert dataset.get_control_counts() == (3, 2)
+    assert dataset.get_test_counts() == (2, 1)
+    assert dataset.get_control_array().dtype == "uint8"
+
+
+@pytest.mark.parametrize("accessor", ["get_control_array", "get_test_array", "get_control_data",
+                                      "get_test_data", "get_combined_array", "get_combined_data"])
+def test_fast_mode_has_no_per_user_data(accessor):
+    dataset = ABTestDataSet(ABTestConfig(random_seed=0), fast_mode=True)
+    assert dataset.get_control_counts()[0] == 1000
+    with pytest.raises(ValueError):
+        getattr(dataset, accessor)()
@@ -0,0 +1,26 @@
+import pytest
+import _kernels
+from _kernels import simulate_counts
+
+
+@pytest.mark.skipif(not _kernels.NUMBA_AVAILABLE, reason="numba is not installed")
+def test_numba_counts_are_reproducible():
+    args = (300_000, 200_000, 0.1, 0.12)
+    assert simulate_counts(*args, seed=7) == simulate_counts(*args, seed=7)
+    assert simulate_counts(*args, seed=7) != simulate_counts(*args, seed=8)
+
+
+def test_fallback_counts_are_reproducible(monkeypatch):
+    monkeypatch.setattr(_kernels, "NUMBA_AVAILABLE", False)
+    args = (300_000, 200_000, 0.1, 0.12)
+    assert simulate_counts(*args, seed=7) == simulate_counts(*args, seed=7)
+    assert simulate_counts(*args, seed=7) != simulate_counts(*args, seed=8)
+
+
+@pytest.mark.parametrize("numba_available", [False, True])
+def test_groups_with_identical_parameters_draw_different_counts(monkeypatch, numba_available):
+    if numba_available and not _kernels.NUMBA_AVAILABLE:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(_kernels, "NUMBA_AVAILABLE", numba_available)
+    k_c, k_t = simulate_counts(1_000_000, 1_000_000, 0.5, 0.5, seed=3)
+    assert k_c != k_t
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+from config import ABTestConfig
+from data_generator import ABTestDataSet
+from tester import ABTestAnalyzer
+
+
+@pytest.mark.parametrize("alternative", ['two-sided', 'less', 'greater'])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_closed_form_t_test_matches_scipy(alternative, seed):
+    config = ABTestConfig(n_control=1500, n_test=1200, expected_uplift=0.02,
+                          random_seed=seed, alternative_hypothesis=alternative)
+    dataset = ABTestDataSet(config)
+    closed_form = dict(ABTestAnalyzer(dataset).run_analysis())
+    exact = ABTestAnalyzer(dataset, use_exact=True).run_analysis()
+    assert closed_form['t_statistic'] == pytest.approx(exact['t_statistic'], rel=1e-9)
+    assert closed_form['p_value'] == pytest.approx(exact['p_value'], rel=1e-9)
+
+
+@pytest.mark.parametrize("alternative", ['two-sided', 'less', 'greater'])
+@pytest.mark.parametrize("value", [0, 1])
+def test_degenerate_groups_give_nan(alternative, value):
+    control_df = pd.DataFrame({'converted': np.full(50, value)})
+    test_df = pd.DataFrame({'converted': np.full(40, value)})
+    for use_exact in (False, True):
+        config = ABTestConfig(alternative_hypothesis=alternative)
+        dataset = ABTestDataSet(config, control_df=control_df, test_df=test_df)
+        results = ABTestAnalyzer(dataset, use_exact=use_exact).run_analysis()
+        assert np.isnan(results['t_statistic'])
+        assert np.isnan(results['p_value'])
+
+
+def test_use_exact_requires_per_user_data():
+    dataset = ABTestDataSet(ABTestConfig(random_seed=0), fast_mode=True)
+    with pytest.raises(ValueError):
+        ABTestAnalyzer(dataset, use_exact=True).run_analysis()
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+from config import ABTestConfig
+from tester_app import ABTestSimulator
+
+
+def test_power_simulation_type_i_rate_matches_alpha():
+    config = ABTestConfig(n_control=2000, n_test=2000, expected_uplift=0.0, alpha=0.05, random_seed=0)
+    p_values = ABTestSimulator(config).run_power_simulation(20_000)
+    assert p_values.shape == (20_000,)
+    assert np.mean(p_values < config.alpha) == pytest.approx(config.alpha, abs=0.01)
+
+
+@pytest.mark.parametrize("n_replications", [0, -5])
+def test_power_simulation_rejects_non_positive_replications(n_replications):
+    with pytest.raises(ValueError):
+        ABTestSimulator(ABTestConfig()).run_power_simulation(n_replications)
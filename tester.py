@@ -1,55 +1,100 @@
 from data_generator import ABTestDataSet
-import pandas as pd
 import numpy as np
 from scipy import stats
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+def welch_t_test(n1, p1, var1, n2, p2, var2, alternative: str = 'two-sided'):
+    """
+    Closed-form Welch's t-test for two proportions given per-group sample sizes,
+    conversion rates and Bernoulli variances p * (1 - p).
+
+    Arguments may be scalars or equally-shaped arrays (e.g. one entry per simulated replication).
+    Returns (t_statistic, p_value); both are NaN where the test is undefined (n < 2 or zero variance).
+    """
+    n1 = np.asarray(n1, dtype=np.float64)
+    n2 = np.asarray(n2, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Squared standard errors using the unbiased sample variance (ddof=1), as ttest_ind does
+        v1 = var1 / (n1 - 1)
+        v2 = var2 / (n2 - 1)
+        se = np.sqrt(v1 + v2)
+        valid = (n1 >= 2) & (n2 >= 2) & (se > 0)
+        t_stat = np.where(valid, (p1 - p2) / se, np.nan)
+        df = np.where(valid, (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1)), np.nan)
+
+    if alternative == 'less':
+        p_value = stats.t.cdf(t_stat, df)
+    elif alternative == 'greater':
+        p_value = stats.t.sf(t_stat, df)
+    else:
+        p_value = 2 * stats.t.sf(np.abs(t_stat), df)
+    return t_stat, p_value
+
+
 class ABTestAnalyzer:
     """
     Performs statistical analysis on A/B test data.
     """
-    def __init__(self, dataset: ABTestDataSet):
+    def __init__(self, dataset: ABTestDataSet, use_exact: bool = False):
         """
         Initializes the analyzer with an ABTestDataSet.
+
+        Args:
+            dataset (ABTestDataSet): The data to analyze.
+            use_exact (bool): If True, run scipy's ttest_ind over the raw samples instead of
+                              the closed-form test. Slower; test_tester.py uses it to validate
+                              the closed-form results.
         """
         self.dataset = dataset
+        self.use_exact = use_exact
         self.config = dataset.config
+        # Two-sided critical value for the confidence intervals, computed once per analyzer
+        self._z_half = stats.norm.isf(self.config.alpha / 2)
         self._results: dict = {}
         logger.info("ABTestAnalyzer initialized.")
 
-    def _calculate_conversion_rate(self, data: pd.DataFrame) -> float:
-        """Helper to calculate conversion rate."""
-        if 'converted' not in data.columns:
-            raise ValueError("DataFrame must contain a 'converted' column.")
-        return data['converted'].mean()
+    def _summarize(self, n: int, k: int) -> tuple[float, float]:
+        """
+        Converts a group's (n, k) conversion counts into its rate and variance.
+        Returns (p, var) where var is the Bernoulli variance p * (1 - p).
+        """
+        p = k / n
+        var = p * (1 - p)
+        return p, var
 
-    def _calculate_confidence_interval(self, data: pd.DataFrame) -> tuple[float, float]:
+    def _calculate_confidence_interval(self, n: int, p: float, var: float) -> tuple[float, float]:
         """
         Calculates the confidence interval for a proportion (conversion rate).
         Uses Wald interval (Normal Approximation).
         """
-        n = len(data)
         if n == 0:
             return (np.nan, np.nan)
-        p = self._calculate_conversion_rate(data)
         if p == 0 or p == 1: # Handle edge cases for SE calculation
             logger.warning(f"Conversion rate is {p}. Confidence interval may be degenerate.")
             return (p, p)
-        se = np.sqrt(p * (1 - p) / n)
-        z_score = stats.norm.ppf(1 - self.config.alpha / 2)
-        margin_of_error = z_score * se
+        se = np.sqrt(var / n)
+        margin_of_error = self._z_half * se
         return (p - margin_of_error, p + margin_of_error)
 
-    def _perform_t_test(self, control_data: pd.DataFrame, test_data: pd.DataFrame) -> tuple[float, float]:
+    def _perform_t_test(self, n1: int, p1: float, var1: float,
+                        n2: int, p2: float, var2: float) -> tuple[float, float]:
         """
-        Performs Welch's t-test for independent samples.
+        Performs Welch's t-test for independent samples from per-group summaries.
+        Equivalent to stats.ttest_ind(..., equal_var=False) on the raw 0/1 data.
+        """
+        t_stat, p_value = welch_t_test(n1, p1, var1, n2, p2, var2, self.config.alternative_hypothesis)
+        return float(t_stat), float(p_value)
+
+    def _perform_exact_t_test(self, control_data: np.ndarray, test_data: np.ndarray) -> tuple[float, float]:
+        """
+        Performs Welch's t-test with scipy over the raw samples.
         """
         t_stat, p_value = stats.ttest_ind(
-            control_data['converted'],
-            test_data['converted'],
+            control_data,
+            test_data,
             equal_var=False, # Welch's t-test, doesn't assume equal variances
             alternative=self.config.alternative_hypothesis
         )
@@ -60,32 +105,41 @@ class ABTestAnalyzer:
         Executes all statistical analyses and stores results.
         """
         logger.info("Running statistical analysis...")
-        control_df = self.dataset.get_control_data()
-        test_df = self.dataset.get_test_data()
+        n_control, k_control = self.dataset.get_control_counts()
+        n_test, k_test = self.dataset.get_test_counts()
 
-        if control_df.empty or test_df.empty:
+        if n_control == 0 or n_test == 0:
             raise ValueError("Cannot perform analysis on empty datasets.")
+        if self.use_exact and self.dataset.fast_mode:
+            raise ValueError("use_exact requires per-user data; it cannot be used with a fast-mode dataset.")
+
+        p_control, var_control = self._summarize(n_control, k_control)
+        p_test, var_test = self._summarize(n_test, k_test)
 
-        self._results['control_conversion'] = self._calculate_conversion_rate(control_df)
-        self._results['test_conversion'] = self._calculate_conversion_rate(test_df)
+        self._results['control_conversion'] = p_control
+        self._results['test_conversion'] = p_test
         self._results['observed_difference'] = self._results['test_conversion'] - self._results['control_conversion']
 
-        ci_control_lower, ci_control_upper = self._calculate_confidence_interval(control_df)
-        ci_test_lower, ci_test_upper = self._calculate_confidence_interval(test_df)
+        ci_control_lower, ci_control_upper = self._calculate_confidence_interval(n_control, p_control, var_control)
+        ci_test_lower, ci_test_upper = self._calculate_confidence_interval(n_test, p_test, var_test)
         self._results['ci_control_lower'] = ci_control_lower
         self._results['ci_control_upper'] = ci_control_upper
         self._results['ci_test_lower'] = ci_test_lower
         self._results['ci_test_upper'] = ci_test_upper
 
-        self._results['t_statistic'], self._results['p_value'] = \
-            self._perform_t_test(control_df, test_df)
+        if self.use_exact:
+            self._results['t_statistic'], self._results['p_value'] = \
+                self._perform_exact_t_test(self.dataset.get_control_array(), self.dataset.get_test_array())
+        else:
+            self._results['t_statistic'], self._results['p_value'] = \
+                self._perform_t_test(n_control, p_control, var_control, n_test, p_test, var_test)
 
         self._results['alpha'] = self.config.alpha
         self._results['alternative_hypothesis'] = self.config.alternative_hypothesis
-        self._results['control_size'] = len(control_df)
-        self._results['test_size'] = len(test_df)
+        self._results['control_size'] = n_control
+        self._results['test_size'] = n_test
+        logger.debug("Analysis results: %s", self._results)
 
-        print(f"printing the result : {self._results['control_conversion']}")
 
         logger.info("Analysis complete.")
         return self._results
@@ -1,16 +1,51 @@
+import hashlib
+import io
 import logging
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 from config import ABTestConfig
 from data_generator import ABTestDataSet
-from tester import ABTestAnalyzer
+from tester import ABTestAnalyzer, welch_t_test
 from reporter import ABTestReporter
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def _converted_hash(df: pd.DataFrame) -> bytes:
+    """Content hash of an uploaded frame's 'converted' column, used as a cache key."""
+    return hashlib.blake2b(np.ascontiguousarray(df['converted'].to_numpy()).tobytes()).digest()
+
+
+def _read_converted_csv(uploaded_file) -> pd.DataFrame:
+    """
+    Reads only the 'converted' column of an uploaded CSV.
+    Uses the multithreaded pyarrow parser when available, otherwise pandas' default engine.
+    Values are left as parsed (no narrow dtype, which would wrap out-of-range values into 0/1);
+    ABTestDataSet validates them and downcasts to uint8.
+    """
+    # Read the upload once; both engines can then parse from the in-memory buffer
+    buffer = io.BytesIO(uploaded_file.getvalue())
+    try:
+        return pd.read_csv(buffer, engine='pyarrow', usecols=['converted'])
+    except ImportError:
+        logger.info("pyarrow is not installed; falling back to the default CSV engine.")
+        buffer.seek(0)
+        return pd.read_csv(buffer, usecols=['converted'])
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_dataset(n_control: int, n_test: int, baseline_conversion_rate: float, expected_uplift: float,
+                   random_seed: int, control_hash: bytes, test_hash: bytes,
+                   _config: ABTestConfig, _control_df: pd.DataFrame, _test_df: pd.DataFrame) -> ABTestDataSet:
+    """
+    Builds the data set, cached on the parameters that determine the data.
+    Alpha and the alternative hypothesis are not part of the key, so changing them only
+    re-runs the closed-form analysis. Underscored arguments are excluded from hashing.
+    """
+    return ABTestDataSet(_config, control_df=_control_df, test_df=_test_df)
+
+
 class ABTestSimulator:
     """
     Orchestrates the entire A/B testing simulation process.
@@ -29,15 +64,45 @@ class ABTestSimulator:
         self.results: dict = {}
         logger.info("ABTestSimulator initialized.")
 
+    def _get_dataset(self) -> ABTestDataSet:
+        """
+        Returns the data set for the current configuration, reusing a cached one when the
+        data-defining inputs are unchanged.
+        """
+        uploaded = self.control_df_input is not None and self.test_df_input is not None
+        if uploaded:
+            if 'converted' not in self.control_df_input.columns or 'converted' not in self.test_df_input.columns:
+                # Let ABTestDataSet raise its usual validation error
+                return ABTestDataSet(self.config, control_df=self.control_df_input, test_df=self.test_df_input)
+            control_hash = _converted_hash(self.control_df_input)
+            test_hash = _converted_hash(self.test_df_input)
+        elif self.config.random_seed is None:
+            # Unseeded draws are meant to differ between runs
+            return ABTestDataSet(self.config)
+        else:
+            control_hash = test_hash = None
+
+        dataset = _build_dataset(
+            self.config.n_control, self.config.n_test,
+            self.config.baseline_conversion_rate, self.config.expected_uplift,
+            self.config.random_seed, control_hash, test_hash,
+            self.config, self.control_df_input, self.test_df_input
+        )
+        # The cached copy carries the config it was built with; adopt the current one
+        self.config.n_control = dataset.config.n_control
+        self.config.n_test = dataset.config.n_test
+        dataset.config = self.config
+        return dataset
+
     def run_simulation(self):
         """
         Runs the full A/B test simulation: data generation/loading, analysis, and reporting.
-        Returns the report string and plot figure.
+        Returns the report string and the conversion rates chart.
         """
         logger.info(f"Starting A/B Test Simulation with config: {self.config.__dict__}")
         try:
             # 1. Data Generation or Loading
-            self.dataset = ABTestDataSet(self.config, control_df=self.control_df_input, test_df=self.test_df_input)
+            self.dataset = self._get_dataset()
 
             # 2. Statistical Analysis
             self.analyzer = ABTestAnalyzer(self.dataset)
@@ -46,10 +111,10 @@ class ABTestSimulator:
             # 3. Reporting
             self.reporter = ABTestReporter(self.results)
             report_markdown = self.reporter.get_summary_markdown_string()
-            plot_figure = self.reporter.get_conversion_rates_plot()
+            chart = self.reporter.get_conversion_chart_spec()
 
             logger.info("A/B Test Simulation completed successfully.")
-            return report_markdown, plot_figure
+            return report_markdown, chart
 
         except ValueError as e:
             logger.error(f"Configuration or Data Error: {e}")
@@ -59,7 +124,32 @@ class ABTestSimulator:
             logger.error(f"An unexpected error occurred during simulation: {e}", exc_info=True)
             st.error(f"An unexpected error occurred: {e}")
             return None, None # Indicate failure
-        
+
+    def run_power_simulation(self, n_replications: int) -> np.ndarray:
+        """
+        Simulates many independent replications of the configured experiment at once and
+        returns the p-value of each, e.g. for estimating power as (p_values < alpha).mean().
+
+        Conversion counts are drawn directly with rng.binomial(n, p, size=n_replications),
+        so memory stays O(n_replications) rather than O(n_replications * n).
+        """
+        if n_replications <= 0:
+            raise ValueError("Number of replications must be a positive integer.")
+        rng = np.random.default_rng(self.config.random_seed)
+        n_c, n_t = self.config.n_control, self.config.n_test
+        p_c = self.config.baseline_conversion_rate
+        p_t = min(self.config.baseline_conversion_rate + self.config.expected_uplift, 1.0) # Cap at 1.0
+
+        p_hat_c = rng.binomial(n_c, p_c, size=n_replications) / n_c
+        p_hat_t = rng.binomial(n_t, p_t, size=n_replications) / n_t
+        _, p_values = welch_t_test(
+            n_c, p_hat_c, p_hat_c * (1 - p_hat_c),
+            n_t, p_hat_t, p_hat_t * (1 - p_hat_t),
+            self.config.alternative_hypothesis
+        )
+        logger.info(f"Power simulation completed with {n_replications} replications.")
+        return p_values
+
 def main():
     st.set_page_config(layout="wide", page_title="A/B Testing Simulator")
 
@@ -91,7 +181,7 @@ def main():
 
         if control_file is not None:
             try:
-                control_df_uploaded = pd.read_csv(control_file)
+                control_df_uploaded = _read_converted_csv(control_file)
                 st.sidebar.success(f"Control data loaded: {len(control_df_uploaded)} rows.")
                 st.sidebar.dataframe(control_df_uploaded.head(3))
             except Exception as e:
@@ -99,7 +189,7 @@ def main():
                 control_df_uploaded = None
         if test_file is not None:
             try:
-                test_df_uploaded = pd.read_csv(test_file)
+                test_df_uploaded = _read_converted_csv(test_file)
                 st.sidebar.success(f"Test data loaded: {len(test_df_uploaded)} rows.")
                 st.sidebar.dataframe(test_df_uploaded.head(3))
             except Exception as e:
@@ -117,47 +207,47 @@ def main():
             n_control_default = 1000
             n_test_default = 1000
 
-    else: # Simulate New Data
-        st.sidebar.markdown("---")
-        st.sidebar.subheader("Synthetic Data Parameters")
-        n_control_default = st.sidebar.number_input(
-            "Control Group Size (n_control)", min_value=10, value=1000, step=200
-        )
-        n_test_default = st.sidebar.number_input(
-            "Test Group Size (n_test)", min_value=10, value=1000, step=200
-        )
-        baseline_conversion_rate = st.sidebar.slider(
-            "Baseline Conversion Rate (Control)", min_value=0.01, max_value=0.50, value=0.10, step=0.005
-        )
-        expected_uplift = st.sidebar.slider(
-            "Expected Absolute Uplift (Test vs. Control)", min_value=-0.05, max_value=0.10, value=0.01, step=0.001, format="%.3f"
+    st.sidebar.markdown("---")
+    # Parameter widgets are batched in a form, so adjusting them does not rerun the app
+    # until the run button is pressed. Mode selection and uploads stay outside the form
+    # because they change which widgets are shown.
+    with st.sidebar.form("ab_cfg"):
+        if analysis_mode == "Simulate New Data":
+            st.subheader("Synthetic Data Parameters")
+            n_control_default = st.number_input(
+                "Control Group Size (n_control)", min_value=10, value=1000, step=200
+            )
+            n_test_default = st.number_input(
+                "Test Group Size (n_test)", min_value=10, value=1000, step=200
+            )
+            baseline_conversion_rate = st.slider(
+                "Baseline Conversion Rate (Control)", min_value=0.01, max_value=0.50, value=0.10, step=0.005
+            )
+            expected_uplift = st.slider(
+                "Expected Absolute Uplift (Test vs. Control)", min_value=-0.05, max_value=0.10, value=0.01, step=0.001, format="%.3f"
+            )
+            random_seed = st.number_input(
+                "Random Seed (for reproducibility)", min_value=0, value=42, step=1
+            )
+            st.markdown("---")
+
+        st.subheader("Statistical Parameters")
+        alpha = st.slider(
+            "Significance Level (alpha)", min_value=0.001, max_value=0.10, value=0.05, step=0.001, format="%.3f"
         )
-        random_seed = st.sidebar.number_input(
-            "Random Seed (for reproducibility)", min_value=0, value=42, step=1
+        alternative_hypothesis = st.selectbox(
+            "Alternative Hypothesis",
+            ('two-sided', 'greater', 'less'),
+            index=0 # Default to two-sided
         )
 
-
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("Statistical Parameters")
-    alpha = st.sidebar.slider(
-        "Significance Level (alpha)", min_value=0.001, max_value=0.10, value=0.05, step=0.001, format="%.3f"
-    )
-    alternative_hypothesis = st.sidebar.selectbox(
-        "Alternative Hypothesis",
-        ('two-sided', 'greater', 'less'),
-        index=0 # Default to two-sided
-    )
-
-    st.sidebar.markdown("---")
-    run_button = st.sidebar.button("🔬 Run A/B Simulation")
+        submitted = st.form_submit_button("🔬 Run A/B Simulation")
 
     # --- Main Content Area ---
-    if run_button:
+    if submitted:
         if analysis_mode == "Analyze My Own Data" and (control_df_uploaded is None or test_df_uploaded is None):
             st.error("Please upload both Control and Test CSV files to analyze your own data.")
-            run_button = False # Prevent further execution
-
-        if run_button:
+        else:
             with st.spinner("Running simulation and analysis..."):
                 try:
                     # Create config object based on selected mode
@@ -178,13 +268,12 @@ def main():
                         test_df=test_df_uploaded
                     )
 
-                    report_markdown, plot_figure = simulator.run_simulation()
+                    report_markdown, chart = simulator.run_simulation()
 
-                    if report_markdown and plot_figure:
+                    if report_markdown and chart:
                         st.success("Simulation Complete!")
                         st.markdown(report_markdown)
-                        st.pyplot(plot_figure) # Display the plot
-                        plt.close(plot_figure) # Close the figure to free memory
+                        st.altair_chart(chart, width="stretch") # Display the chart
 
                 except ValueError as ve:
                     st.error(f"Configuration Error: {ve}")
@@ -198,4 +287,5 @@ def main():
     st.markdown(f"Current Server Time (Pune, India): {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S IST')}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     main()
\ No newline at end of file